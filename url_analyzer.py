@@ -4,86 +4,345 @@ Simple URL analyzer using Claude API.
 Takes any URL and provides a decompressed analysis of the content.
 """
 
+import io
 import os
+import re
 import sys
-import requests
+import time
+import uuid
+import hashlib
+import sqlite3
+import threading
+from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from anthropic import Anthropic
 import arxiv
+from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 import json
 
 
+# Static instructions sent as the system block. It is marked cacheable, but
+# at ~350 tokens it is below the minimum cacheable prefix (1024 tokens for
+# Sonnet, 2048 for Haiku), so caching only takes effect if it grows past that.
+# Keep it byte-identical across calls: cache hits need an exact prefix match.
+BASE_PROMPT = """You are an expert at quickly understanding and explaining technical content.
+Your task is to decompress this content into a clear, actionable summary.
+
+Provide your analysis in this EXACT format:
+
+## 📝 ONE-LINER
+[What is this in one clear sentence?]
+
+## 🚀 KEY INNOVATION
+[What's new or important here? 1-2 sentences]
+
+## 💡 WHY IT MATTERS
+[Why should someone care? Impact and relevance. 2-3 sentences]
+
+## 🔍 MAIN INSIGHTS
+• [Key point 1]
+• [Key point 2]
+• [Key point 3]
+• [Add more if needed, up to 5 total]
+
+## ⚙️ HOW IT WORKS
+[Brief explanation of the methodology or approach. 2-3 sentences. Skip if not applicable]
+
+## 📊 KEY RESULTS
+[What did they achieve? Include specific metrics if mentioned. 2-3 sentences]
+
+## ⚠️ LIMITATIONS
+[What are the caveats, limitations, or things to watch out for? 1-2 sentences]
+
+## 🔗 CONNECTIONS
+[How does this relate to other work or trends? 1-2 sentences]
+
+## 🎯 WHO SHOULD READ THIS
+[Specific audience who would benefit most. 1 sentence]
+
+## 📌 TLDR
+[2-3 sentence summary for someone with 30 seconds]
+
+## 🤔 SHOULD YOU READ THE FULL VERSION?
+[Yes/No and specific reason why. 1 sentence]
+
+---
+
+Now analyze the content provided by the user.
+"""
+
+# Per-URL prompt content by content type; anything else uses 'article'.
+# Article bodies are trimmed to TARGET_TOKENS before formatting.
+_TEMPLATES = {
+    'arxiv': """
+PAPER: {title}
+AUTHORS: {authors_str}
+URL: {url}
+
+ABSTRACT:
+{abstract}
+""",
+    'tweet': """
+TWEET/THREAD from {url}:
+{content}
+""",
+    'article': """
+URL: {url}
+CONTENT:
+{content}
+""",
+}
+
+_FIELD_DEFAULTS = {
+    'title': 'Unknown',
+    'authors_str': '',
+    'abstract': 'Not available',
+    'content': 'Content not provided',
+}
+
+
+class _Default(dict):
+    """format_map mapping that fills in placeholders for missing fields"""
+    
+    def __missing__(self, key):
+        return _FIELD_DEFAULTS.get(key, 'Not available')
+
+
+# Bump automatically whenever the instructions change so stale analyses miss
+PROMPT_VERSION = hashlib.sha256(BASE_PROMPT.encode('utf-8')).hexdigest()[:12]
+
+CACHE_PATH = os.path.join('out', 'cache.sqlite')
+
+# Stop downloading a page after this many bytes; only MAX_CONTENT_CHARS of
+# extracted text are kept
+MAX_FETCH_BYTES = 200_000
+MAX_CONTENT_CHARS = 50_000
+
+# Token budget for fetched page/tweet text in the prompt, and the rough
+# chars-per-token ratio used when the token counting API is unavailable
+TARGET_TOKENS = 6000
+CHARS_PER_TOKEN = 3.5
+
+# Fetched pages shorter than this (after text extraction) aren't worth a Claude call
+MIN_CONTENT_CHARS = 200
+
+# Interstitials and error pages that come back instead of the real content
+_BLOCKED_PAGE_RE = re.compile(
+    r'Just a moment\.\.\.|Please enable JavaScript|Enable JavaScript and cookies'
+    r'|Checking your browser|Access denied|Attention Required! \| Cloudflare',
+    re.IGNORECASE
+)
+# Interstitials are short once markup is stripped; longer pages that merely
+# mention those phrases are real content
+MAX_INTERSTITIAL_CHARS = 3000
+
+# Every analysis starts on the cheaper, faster Haiku; Sonnet is used on request
+TRIAGE_MODEL = "claude-3-5-haiku-20241022"
+DEEP_MODEL = "claude-3-5-sonnet-20241022"  # Latest Sonnet model
+
+# Items per combined Claude call in batch mode; output tokens scale with it
+BATCH_SIZE = 4
+BATCH_BOUNDARY = "---ITEM BOUNDARY---"
+
+# Concurrent fetches in batch mode; must not exceed the HTTP client's connection limit
+FETCH_WORKERS = 8
+
+ARXIV_HOSTS = ('arxiv.org', 'export.arxiv.org')
+TWEET_HOSTS = ('twitter.com', 'mobile.twitter.com', 'x.com')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# New-style (2401.12345) and old-style (hep-th/9901001, math.GT/0309136) arxiv
+# IDs from abs/, pdf/ or bare links; any vN suffix is dropped
+_ARXIV_RE = re.compile(
+    r'(?:abs/|pdf/|/)(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})'
+)
+
+
+def url_host(url: str) -> str:
+    """Lower-cased host of a URL without a leading www., tolerating a missing scheme"""
+    if '://' not in url:
+        url = 'https://' + url
+    host = urlparse(url).hostname or ''
+    return host.removeprefix('www.')
+
+
+def normalize_url(url: str) -> str:
+    """Session memo key: arxiv links collapse to their paper ID.
+
+    Both ID styles are covered, e.g. arxiv:2401.12345 and arxiv:hep-th/9901001.
+    """
+    host = url_host(url)
+    if host in ARXIV_HOSTS:
+        match = _ARXIV_RE.search(url)
+        if match:
+            return f"arxiv:{match.group(1)}"
+    if '://' not in url:
+        url = 'https://' + url
+    parsed = urlparse(url)
+    key = host + parsed.path.rstrip('/')
+    if parsed.query:
+        key += '?' + parsed.query
+    return key
+
+
+def decode_body(raw: bytes, encoding: str = None) -> str:
+    """Decode a (possibly truncated) response body into readable text"""
+    try:
+        text = raw.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        # Unknown charset advertised by the server
+        text = raw.decode('utf-8', errors='replace')
+    return extract_main_text(text)[:MAX_CONTENT_CHARS]
+
+
+def extract_main_text(html: str) -> str:
+    """Strip markup, scripts and page chrome so the prompt holds article text"""
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
+        for node in soup(['script', 'style', 'noscript', 'nav', 'footer', 'aside']):
+            node.decompose()
+        root = soup.body or soup
+        text = root.get_text(separator=' ', strip=True)
+    except Exception:
+        # Fall back to the raw page if it can't be parsed
+        text = html
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
 class URLAnalyzer:
     """Analyzes any URL content using Claude"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache_path: str = CACHE_PATH):
         # Use provided API key or get from environment
         if api_key:
             self.client = Anthropic(api_key=api_key)
         else:
             self.client = Anthropic()  # Will use ANTHROPIC_API_KEY env var
+        
+        # Per-session memos keyed by normalize_url(), so repeats of a URL
+        # (or abs/pdf variants of a paper) skip the fetch and the API call
+        self._fetch_memo = {}
+        self._analysis_memo = {}
+        
+        # Host -> fetcher; anything else goes through _fetch_generic
+        self._handlers = {host: self.fetch_arxiv for host in ARXIV_HOSTS}
+        self._handlers.update({host: self._tweet_stub for host in TWEET_HOSTS})
+        
+        # Long-lived arxiv client keeps its connection to export.arxiv.org alive
+        self.arxiv_client = arxiv.Client(page_size=1, delay_seconds=0, num_retries=3)
+        
+        # One HTTP/2-capable client: keep-alive connections are pooled and
+        # h2 hosts multiplex concurrent batch fetches over one connection.
+        # No explicit transport, so HTTP(S)_PROXY from the environment is honoured
+        self.http = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            headers={'User-Agent': 'Mozilla/5.0 (compatible; ContentAnalyzer/1.0)'}
+        )
+        
+        # Persistent cache of finished analyses, shared across CLI sessions
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        # Analyses run on the CLI worker thread, not the one that opened the cache
+        self.cache = sqlite3.connect(cache_path, check_same_thread=False)
+        self.cache.execute("PRAGMA journal_mode=WAL")
+        self.cache.execute("PRAGMA synchronous=NORMAL")
+        self.cache.execute(
+            "CREATE TABLE IF NOT EXISTS analyses("
+            "key TEXT PRIMARY KEY, url TEXT, result TEXT, created_at INTEGER)"
+        )
+        self.cache.commit()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Release pooled HTTP connections and the cache database"""
+        self.http.close()
+        self.cache.close()
     
     def fetch_content(self, url: str) -> dict:
         """Fetch content from URL"""
+        key = normalize_url(url)
+        if key in self._fetch_memo:
+            return dict(self._fetch_memo[key])
         
-        # Handle ArXiv papers specially
-        if 'arxiv.org' in url:
-            return self.fetch_arxiv(url)
+        # Dispatch on the exact host, falling back to a plain HTML fetch
+        handler = self._handlers.get(url_host(url), self._fetch_generic)
+        content_data = handler(url)
         
-        # Handle Twitter/X
-        elif 'twitter.com' in url or 'x.com' in url:
-            # For tweets, we'll need to ask user to paste content
-            # since Twitter API requires auth
+        # Only memoize real content; failed fetches and tweets may be retried or pasted
+        if not content_data['needs_paste']:
+            self._fetch_memo[key] = dict(content_data)
+        return content_data
+    
+    def is_tweet(self, url: str) -> bool:
+        """Whether the URL is a tweet, whose content has to be pasted"""
+        return url_host(url) in TWEET_HOSTS
+    
+    def _tweet_stub(self, url: str) -> dict:
+        """Placeholder for tweets; Twitter API requires auth, so the user pastes content"""
+        return {
+            'url': url,
+            'type': 'tweet',
+            'content': None,
+            'needs_paste': True
+        }
+    
+    def _fetch_generic(self, url: str) -> dict:
+        """Fetch an arbitrary page and extract its text"""
+        try:
+            # Stream so large pages aren't fully downloaded
+            with self.http.stream('GET', url) as response:
+                response.raise_for_status()
+                raw = bytearray()
+                for chunk in response.iter_bytes(chunk_size=65536):
+                    raw += chunk
+                    if len(raw) >= MAX_FETCH_BYTES:
+                        break
+                encoding = response.encoding
+            
             return {
                 'url': url,
-                'type': 'tweet',
+                'type': 'article',
+                'content': decode_body(bytes(raw[:MAX_FETCH_BYTES]), encoding),
+                'needs_paste': False
+            }
+        except Exception as e:
+            print(f"Could not fetch URL directly: {e}")
+            return {
+                'url': url,
+                'type': 'unknown',
                 'content': None,
                 'needs_paste': True
             }
-        
-        # For other URLs, try to fetch HTML
-        else:
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (compatible; ContentAnalyzer/1.0)'
-                }
-                response = requests.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
-                
-                return {
-                    'url': url,
-                    'type': 'article',
-                    'content': response.text[:50000],  # Limit content size
-                    'needs_paste': False
-                }
-            except Exception as e:
-                print(f"Could not fetch URL directly: {e}")
-                return {
-                    'url': url,
-                    'type': 'unknown',
-                    'content': None,
-                    'needs_paste': True
-                }
     
     def fetch_arxiv(self, url: str) -> dict:
         """Fetch ArXiv paper details"""
         # Extract paper ID
-        if 'abs/' in url:
-            paper_id = url.split('abs/')[-1].split('v')[0]
-        elif 'pdf/' in url:
-            paper_id = url.split('pdf/')[-1].replace('.pdf', '').split('v')[0]
-        else:
-            paper_id = url.split('/')[-1].split('v')[0]
+        match = _ARXIV_RE.search(url)
         
         try:
+            if not match:
+                raise ValueError(f"no arxiv ID in {url}")
+            paper_id = match.group(1)
             search = arxiv.Search(id_list=[paper_id])
-            paper = next(arxiv.Client().results(search))
+            paper = next(self.arxiv_client.results(search))
             
             return {
                 'url': url,
                 'type': 'arxiv',
+                'paper_id': paper_id,
                 'title': paper.title,
                 'authors': [author.name for author in paper.authors],
+                'authors_str': ', '.join(author.name for author in paper.authors),
                 'abstract': paper.summary,
                 'needs_paste': False
             }
@@ -96,83 +355,190 @@ class URLAnalyzer:
                 'needs_paste': True
             }
     
-    def create_analysis_prompt(self, content_data: dict) -> str:
-        """Create the decompression prompt for Claude"""
+    def fetch_many(self, urls: list) -> list:
+        """Fetch several URLs concurrently, preserving input order"""
+        # Fetch each normalized URL once; duplicates get their own copy of the result
+        unique = {}
+        for url in urls:
+            unique.setdefault(normalize_url(url), url)
         
-        base_prompt = """You are an expert at quickly understanding and explaining technical content.
-Your task is to decompress this content into a clear, actionable summary.
-
-Provide your analysis in this EXACT format:
-
-## 📝 ONE-LINER
-[What is this in one clear sentence?]
-
-## 🚀 KEY INNOVATION
-[What's new or important here? 1-2 sentences]
-
-## 💡 WHY IT MATTERS
-[Why should someone care? Impact and relevance. 2-3 sentences]
-
-## 🔍 MAIN INSIGHTS
-• [Key point 1]
-• [Key point 2]
-• [Key point 3]
-• [Add more if needed, up to 5 total]
-
-## ⚙️ HOW IT WORKS
-[Brief explanation of the methodology or approach. 2-3 sentences. Skip if not applicable]
-
-## 📊 KEY RESULTS
-[What did they achieve? Include specific metrics if mentioned. 2-3 sentences]
-
-## ⚠️ LIMITATIONS
-[What are the caveats, limitations, or things to watch out for? 1-2 sentences]
-
-## 🔗 CONNECTIONS
-[How does this relate to other work or trends? 1-2 sentences]
-
-## 🎯 WHO SHOULD READ THIS
-[Specific audience who would benefit most. 1 sentence]
-
-## 📌 TLDR
-[2-3 sentence summary for someone with 30 seconds]
-
-## 🤔 SHOULD YOU READ THE FULL VERSION?
-[Yes/No and specific reason why. 1 sentence]
-
----
-
-Now analyze this content:
-
-"""
+        print(f"📥 Fetching {len(unique)} URLs concurrently...")
+        # Workers share the pooled HTTP client, which is thread-safe
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            fetched = dict(zip(unique, executor.map(self.fetch_content, unique.values())))
+        
+        results = []
+        for url in urls:
+            content_data = dict(fetched[normalize_url(url)])
+            content_data['url'] = url
+            results.append(content_data)
+        return results
+    
+    def _count_tokens(self, text: str) -> int:
+        """Exact input token count for text sent as a user message"""
+        response = self.client.beta.messages.count_tokens(
+            model=TRIAGE_MODEL,
+            messages=[{"role": "user", "content": text}],
+            betas=["token-counting-2024-11-01"]
+        )
+        return response.input_tokens
+    
+    def fit_to_token_budget(self, text: str, budget: int = TARGET_TOKENS) -> str:
+        """Trim text to at most `budget` input tokens"""
+        # A token is at least one character, so short text can't be over budget.
+        # Anything longer is counted: a chars/token guess tuned for English prose
+        # undercounts CJK and code-heavy pages several times over.
+        if len(text) <= budget:
+            return text
         
-        # Format content based on type
-        if content_data['type'] == 'arxiv':
-            content_str = f"""
-PAPER: {content_data.get('title', 'Unknown')}
-AUTHORS: {', '.join(content_data.get('authors', []))}
-URL: {content_data['url']}
+        try:
+            tokens = self._count_tokens(text)
+            # Shrink by the measured chars/token ratio of this text; a few rounds converge
+            for _ in range(3):
+                if tokens <= budget:
+                    return text
+                text = text[:int(len(text) * budget / tokens * 0.98)]
+                tokens = self._count_tokens(text)
+            if tokens <= budget:
+                return text
+        except Exception as e:
+            print(f"Could not count tokens, estimating instead: {e}")
+            return text[:int(budget * CHARS_PER_TOKEN)]
+        
+        # Still over after the measured rounds: cut to a length that can't exceed the budget
+        return text[:budget]
+    
+    def _system_blocks(self) -> list:
+        """System prompt blocks; cacheable once BASE_PROMPT exceeds the model's minimum prefix"""
+        return [
+            {
+                "type": "text",
+                "text": BASE_PROMPT,
+                "cache_control": {"type": "ephemeral"}
+            }
+        ]
+    
+    def _user_blocks(self, prompt: str) -> list:
+        """User message blocks for the per-URL content"""
+        return [{"type": "text", "text": prompt}]
+    
+    def _cache_key(self, content_data: dict, model: str) -> str:
+        """Key an analysis by source, fetched content, prompt version and model.
 
-ABSTRACT:
-{content_data.get('abstract', 'Not available')}
-"""
-        elif content_data['type'] == 'tweet':
-            content_str = f"""
-TWEET/THREAD from {content_data['url']}:
-{content_data.get('content', 'Content not provided')}
-"""
+        Uses the untrimmed content so the key can be checked before any
+        token counting.
+        """
+        # Versionless arxiv IDs make abs/pdf/vN links to one paper share a key,
+        # so hash the paper itself rather than anything embedding the raw URL
+        if content_data.get('paper_id'):
+            source = f"arxiv:{content_data['paper_id']}"
+            body = f"{content_data['title']}\n{content_data['abstract']}"
         else:
-            # For articles and other content
-            content_str = f"""
-URL: {content_data['url']}
-CONTENT:
-{content_data.get('content', 'Content not provided')[:10000]}  # Limit for token management
-"""
+            source = content_data['url']
+            body = f"{content_data['type']}\n{content_data.get('content') or ''}"
+        content_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        return hashlib.sha256(
+            f"{source}|{content_hash}|{PROMPT_VERSION}|{model}".encode('utf-8')
+        ).hexdigest()
+    
+    def _cache_get(self, key: str):
+        """Return a cached analysis or None"""
+        row = self.cache.execute(
+            "SELECT result FROM analyses WHERE key=?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def _cache_put(self, key: str, url: str, result: str):
+        """Store a finished analysis"""
+        self.cache.execute(
+            "INSERT OR REPLACE INTO analyses(key, url, result, created_at) VALUES (?, ?, ?, ?)",
+            (key, url, result, int(time.time()))
+        )
+        self.cache.commit()
+    
+    def create_analysis_prompt(self, content_data: dict) -> str:
+        """Create the per-URL part of the prompt (instructions live in BASE_PROMPT)"""
+        template = _TEMPLATES.get(content_data['type'], _TEMPLATES['article'])
+        return template.format_map(_Default(content_data))
+    
+    def _prepare(self, content_data: dict, model: str) -> tuple:
+        """Validate and format fetched content.
+
+        Returns (early_result, prompt, cache_key); early_result is a warning
+        or cached analysis when no Claude call is needed.
+        """
+        
+        # Don't spend tokens on empty pages or bot-check interstitials; tweets
+        # are legitimately short and arxiv abstracts come from the API
+        if content_data['type'] not in ('arxiv', 'tweet'):
+            body = (content_data.get('content') or '').strip()
+            if len(body) < MIN_CONTENT_CHARS:
+                return "⚠️  Content too short to analyze meaningfully.", None, None
+            if len(body) < MAX_INTERSTITIAL_CHARS and _BLOCKED_PAGE_RE.search(body):
+                return "⚠️  The page returned a bot check or access error instead of its content. Try pasting the content.", None, None
+        
+        # Reuse a previous analysis of identical content
+        cache_key = self._cache_key(content_data, model)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            print("⚡ Using cached analysis")
+            return cached, None, cache_key
+        
+        # Keep fetched or pasted text within the token budget
+        if content_data.get('content'):
+            content_data['content'] = self.fit_to_token_budget(content_data['content'])
+        
+        # Create prompt
+        prompt = self.create_analysis_prompt(content_data)
+        return None, prompt, cache_key
+    
+    def _call_claude(self, user_blocks: list, model: str, max_tokens: int = 2000,
+                     stream: bool = False) -> str:
+        """Send one analysis request; raises on API errors"""
+        request = dict(
+            model=model,
+            max_tokens=max_tokens,
+            system=self._system_blocks(),
+            messages=[
+                {"role": "user", "content": user_blocks}
+            ],
+            betas=["prompt-caching-2024-07-31"]  # Enable prompt caching for efficiency
+        )
         
-        return base_prompt + content_str
+        if not stream:
+            response = self.client.beta.messages.create(**request)
+            return response.content[0].text
+        
+        # Print tokens as they arrive so output starts at time-to-first-token
+        buf = []
+        with self.client.beta.messages.stream(**request) as response:
+            for text in response.text_stream:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+                buf.append(text)
+        print()
+        return ''.join(buf)
     
-    def analyze(self, url: str, pasted_content: str = None) -> str:
-        """Main analysis function"""
+    def analyze(self, url: str, pasted_content: str = None, stream: bool = True,
+                model: str = TRIAGE_MODEL) -> str:
+        """Main analysis function.
+
+        Runs on TRIAGE_MODEL unless a model (e.g. DEEP_MODEL) is given.
+        With stream=True the analysis is written to stdout as it is generated
+        (cached results and warnings are printed whole); the full text is
+        returned either way.
+        """
+        
+        def finish(text: str) -> str:
+            if stream:
+                print(text)
+            return text
+        
+        # Same URL already analyzed this session (pasted content may differ, so skip those)
+        memo_key = (model, normalize_url(url))
+        if pasted_content is None and memo_key in self._analysis_memo:
+            print("⚡ Already analyzed this session")
+            return finish(self._analysis_memo[memo_key])
         
         # Fetch content
         print(f"📥 Fetching content from: {url}")
@@ -182,27 +548,119 @@ CONTENT:
         if content_data['needs_paste'] and pasted_content:
             content_data['content'] = pasted_content
         elif content_data['needs_paste'] and not pasted_content:
-            return "⚠️  This URL requires manual content paste. Please provide the content."
+            return finish("⚠️  This URL requires manual content paste. Please provide the content.")
         
-        # Create prompt
-        prompt = self.create_analysis_prompt(content_data)
+        early_result, prompt, cache_key = self._prepare(content_data, model)
+        if early_result is not None:
+            if cache_key is not None and pasted_content is None:
+                self._analysis_memo[memo_key] = early_result
+            return finish(early_result)
         
         # Call Claude using the beta API for large context
-        print("🤖 Analyzing with Claude...")
+        print(f"🤖 Analyzing with Claude ({model})...")
         try:
-            response = self.client.beta.messages.create(
-                model="claude-3-5-sonnet-20241022",  # Latest Sonnet model
-                max_tokens=2000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                betas=["prompt-caching-2024-07-31"]  # Enable prompt caching for efficiency
+            result = self._call_claude(
+                self._user_blocks(prompt), model, stream=stream
             )
+        except Exception as e:
+            return finish(f"❌ Error calling Claude API: {e}")
+        
+        self._cache_put(cache_key, url, result)
+        if pasted_content is None:
+            self._analysis_memo[memo_key] = result
+        return result
+    
+    def analyze_batch(self, items: list, model: str = TRIAGE_MODEL) -> list:
+        """Analyze several fetched items, sharing one Claude call per group.
+
+        Takes content_data dicts (as returned by fetch_content/fetch_many) and
+        returns one analysis per item, in order. Items that need a paste, are
+        too short, or are already cached never reach the API, and duplicates
+        within the batch (e.g. abs/ and pdf/ links to one paper) are analyzed once.
+        """
+        results = [None] * len(items)
+        # cache_key -> (indices sharing it, content_data, prompt)
+        pending = {}
+        # memo_key -> cache_key of items already queued in this batch
+        queued = {}
+        
+        for i, content_data in enumerate(items):
+            memo_key = (model, normalize_url(content_data['url']))
+            if memo_key in self._analysis_memo:
+                results[i] = self._analysis_memo[memo_key]
+                continue
+            if memo_key in queued:
+                pending[queued[memo_key]][0].append(i)
+                continue
+            if content_data['needs_paste']:
+                results[i] = "⚠️  This URL requires manual content paste. Please provide the content."
+                continue
             
-            return response.content[0].text
+            early_result, prompt, cache_key = self._prepare(content_data, model)
+            if early_result is not None:
+                if cache_key is not None:
+                    self._analysis_memo[memo_key] = early_result
+                results[i] = early_result
+                continue
             
-        except Exception as e:
-            return f"❌ Error calling Claude API: {e}"
+            queued[memo_key] = cache_key
+            if cache_key in pending:
+                pending[cache_key][0].append(i)
+            else:
+                pending[cache_key] = ([i], content_data, prompt)
+        
+        # Output is capped per request, so split large batches into groups
+        entries = [(indices, content_data, prompt, cache_key)
+                   for cache_key, (indices, content_data, prompt) in pending.items()]
+        for start in range(0, len(entries), BATCH_SIZE):
+            group = entries[start:start + BATCH_SIZE]
+            try:
+                if len(group) == 1:
+                    print(f"🤖 Analyzing with Claude ({model})...")
+                    _, content_data, prompt, _ = group[0]
+                    analyses = [self._call_claude(self._user_blocks(prompt), model)]
+                else:
+                    print(f"🤖 Analyzing {len(group)} items with Claude ({model})...")
+                    analyses = self._call_claude_batch(
+                        [prompt for _, _, prompt, _ in group], model
+                    )
+            except Exception as e:
+                for indices, *_ in group:
+                    for i in indices:
+                        results[i] = f"❌ Error calling Claude API: {e}"
+                continue
+            
+            for (indices, content_data, _, cache_key), result in zip(group, analyses):
+                self._cache_put(cache_key, content_data['url'], result)
+                for i in indices:
+                    self._analysis_memo[(model, normalize_url(items[i]['url']))] = result
+                    results[i] = result
+        
+        return results
+    
+    def _call_claude_batch(self, prompts: list, model: str) -> list:
+        """Ask for one analysis per prompt in a single request"""
+        parts = [
+            f"Analyze the following {len(prompts)} items, producing the analysis format "
+            f"once per item, in order, separated by a line containing only {BATCH_BOUNDARY}.\n"
+        ]
+        for n, prompt in enumerate(prompts, 1):
+            parts.append(f"\nITEM {n}:\n{prompt}")
+        
+        text = self._call_claude(
+            [{"type": "text", "text": ''.join(parts)}],
+            model,
+            max_tokens=2000 * len(prompts)
+        )
+        analyses = [a.strip() for a in text.split(BATCH_BOUNDARY) if a.strip()]
+        
+        # If the boundaries didn't come back as asked, analyze one by one
+        if len(analyses) != len(prompts):
+            print("⚠️  Batched response didn't split cleanly, analyzing items individually")
+            analyses = [
+                self._call_claude(self._user_blocks(prompt), model) for prompt in prompts
+            ]
+        return analyses
 
 
 def main():
@@ -218,62 +676,212 @@ def main():
         print("\nOr add it to your ~/.bashrc or ~/.zshrc file")
         sys.exit(1)
     
-    analyzer = URLAnalyzer(api_key)
+    with URLAnalyzer(api_key) as analyzer:
+        run_cli(analyzer)
+
+
+def parse_batch_input(text: str) -> list:
+    """Return the URLs for batch mode, or None for a single URL.
+
+    Batch mode is triggered by several space-separated URLs or by the
+    path to a text file with one URL per line.
+    """
+    if text.endswith('.txt') and os.path.isfile(text):
+        with open(text) as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    
+    urls = text.split()
+    if len(urls) > 1:
+        return urls
+    return None
+
+
+def print_result_header(url: str):
+    """Label an analysis with its URL"""
+    print("\n" + "="*60)
+    print(f"📄 {url}")
+    print("-"*60)
+
+
+def print_result_footer(deep_url: str = None):
+    print("="*60)
+    print("💾 Type 'save' to keep finished analyses")
+    if deep_url:
+        print(f"🔬 Type 'deep' to rerun {deep_url} with Sonnet")
+
+
+def analysis_worker(analyzer: URLAnalyzer, jobs: Queue, finished: list,
+                    rerun: dict, lock: threading.Lock):
+    """Consume jobs until a None sentinel.
+
+    A job is either a (url, pasted_content, model) tuple, fetched and analyzed
+    on its own with streamed output, or a (urls, model) tuple whose URLs are
+    fetched with fetch_many and analyzed together with analyze_batch.
+    rerun['job'] is set to the (url, pasted_content) of the most recently
+    finished non-Sonnet analysis, which is what 'deep' reruns.
+    """
+    
+    while True:
+        job = jobs.get()
+        try:
+            if job is None:
+                return
+            
+            if isinstance(job[0], list):
+                urls, model = job
+                items = analyzer.fetch_many(urls)
+                results = analyzer.analyze_batch(items, model=model)
+                for n, (content_data, result) in enumerate(zip(items, results), 1):
+                    url = content_data['url']
+                    with lock:
+                        finished.append((url, result))
+                        if model != DEEP_MODEL:
+                            rerun['job'] = (url, None)
+                    print_result_header(url)
+                    print(result)
+                    # Only the last item is what 'deep' would rerun
+                    last = n == len(items) and model != DEEP_MODEL
+                    print_result_footer(deep_url=url if last else None)
+                continue
+            
+            url, pasted_content, model = job
+            # The body streams in between header and footer
+            print_result_header(url)
+            result = analyzer.analyze(url, pasted_content, model=model)
+            with lock:
+                finished.append((url, result))
+                if model != DEEP_MODEL:
+                    rerun['job'] = (url, pasted_content)
+            print_result_footer(deep_url=url if model != DEEP_MODEL else None)
+        except Exception as e:
+            print(f"❌ Error analyzing queued job: {e}")
+        finally:
+            jobs.task_done()
+
+
+def save_finished(finished: list, lock: threading.Lock):
+    """Save and clear every finished analysis"""
+    
+    with lock:
+        pending = finished[:]
+        finished.clear()
+    if not pending:
+        print("Nothing to save yet")
+    for url, result in pending:
+        save_analysis(url, result)
+
+
+def save_analysis(url: str, result: str):
+    """Write an analysis to the out/ directory"""
+    
+    # Create output directory if it doesn't exist
+    os.makedirs('out', exist_ok=True)
+    
+    # Generate filename
+    domain = urlparse(url).netloc.replace('.', '_')
+    # Timestamp + random suffix: unique across concurrent sessions, no directory scan
+    filename = f"analysis_{domain}_{int(time.time())}_{uuid.uuid4().hex[:6]}.md"
+    filepath = os.path.join('out', filename)
+    
+    # Encode once and write in a single call; O_EXCL refuses to overwrite an existing file
+    data = (f"# Analysis of {url}\n\n" + result).encode('utf-8')
+    fd = os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    
+    print(f"✅ Saved to: {filepath}")
+
+
+def run_cli(analyzer: URLAnalyzer):
+    """Interactive prompt loop"""
     
     print("🔍 URL Content Analyzer (powered by Claude)")
     print("-" * 60)
-    print("Enter a URL to analyze (or 'quit' to exit)")
+    print("Enter a URL to analyze, 'save' to keep finished analyses, or 'quit' to exit")
+    print("Several space-separated URLs or a urls.txt file are fetched in batch")
+    print("Add --deep to use Sonnet instead of Haiku, or type 'deep' to rerun the last finished analysis")
     print("Supports: ArXiv papers, articles, tweets (paste required)")
     print("-" * 60)
     
+    # Fetching and Claude calls run on a worker thread so the next URL
+    # can be entered while the previous one is still being analyzed
+    jobs = Queue()
+    finished = []
+    # (url, pasted_content) of the last finished Haiku analysis, for 'deep' reruns
+    rerun = {}
+    lock = threading.Lock()
+    worker = threading.Thread(
+        target=analysis_worker, args=(analyzer, jobs, finished, rerun, lock), daemon=True
+    )
+    worker.start()
+    
     while True:
         print("\n📎 Enter URL:")
         url = input("> ").strip()
         
         if url.lower() in ['quit', 'exit', 'q']:
+            if jobs.unfinished_tasks:
+                print("⏳ Waiting for queued analyses to finish...")
+            jobs.join()
+            if finished:
+                save = input(f"\n💾 Save {len(finished)} unsaved analyses? (y/n): ").strip().lower()
+                if save == 'y':
+                    save_finished(finished, lock)
+            jobs.put(None)
             print("👋 Goodbye!")
             break
         
+        if url.lower() in ['save', 's']:
+            save_finished(finished, lock)
+            continue
+        
+        if url.lower() == 'deep':
+            with lock:
+                job = rerun.get('job')
+            if job is None:
+                print("Nothing to rerun yet")
+            else:
+                jobs.put((*job, DEEP_MODEL))
+                print(f"⏳ Queued {job[0]} for analysis with Sonnet")
+            continue
+        
+        model = TRIAGE_MODEL
+        if url.endswith(' --deep') or url == '--deep':
+            model = DEEP_MODEL
+            url = url.removesuffix('--deep').strip()
+        
         if not url:
             continue
         
+        # Batch mode: the worker fetches concurrently, then analyzes in shared Claude calls
+        batch_urls = parse_batch_input(url)
+        if batch_urls:
+            jobs.put((batch_urls, model))
+            print("⏳ Queued for analysis")
+            continue
+        
         # Check if we need pasted content
         pasted_content = None
-        if 'twitter.com' in url or 'x.com' in url:
-            print("\n📋 Please paste the tweet content (press Enter twice when done):")
-            lines = []
+        if analyzer.is_tweet(url):
+            print("\n📋 Please paste the tweet content (enter a single '.' on its own line when done):")
+            # Threads can contain blank lines, so only the '.' sentinel ends the paste
+            buf = io.StringIO()
             while True:
                 line = input()
-                if not line:
+                if line == '.':
                     break
-                lines.append(line)
-            pasted_content = '\n'.join(lines)
-        
-        # Analyze
-        result = analyzer.analyze(url, pasted_content)
-        
-        # Display results
-        print("\n" + "="*60)
-        print(result)
-        print("="*60)
-        
-        # Option to save
-        save = input("\n💾 Save this analysis? (y/n): ").strip().lower()
-        if save == 'y':
-            # Create output directory if it doesn't exist
-            os.makedirs('out', exist_ok=True)
-            
-            # Generate filename
-            domain = urlparse(url).netloc.replace('.', '_')
-            filename = f"analysis_{domain}_{len(os.listdir('out'))}.md"
-            filepath = os.path.join('out', filename)
-            
-            with open(filepath, 'w') as f:
-                f.write(f"# Analysis of {url}\n\n")
-                f.write(result)
-            
-            print(f"✅ Saved to: {filepath}")
+                buf.write(line)
+                buf.write('\n')
+            pasted_content = buf.getvalue()
+        
+        # Queue for analysis
+        jobs.put((url, pasted_content, model))
+        print("⏳ Queued for analysis")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()